@@ -1,11 +1,25 @@
-from __future__ import print_function    # py2 compatibility
-
-from threading import Timer
+from threading import Event, Thread
 import argparse
+import functools
+import itertools
 import json
-import subprocess
 import sys
 
+# use orjson for output serialization when available (much faster on the
+# small dicts we emit for progress/status); fall back to stdlib json
+try:
+    import orjson
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    # bind a single reusable encoder: json.dumps builds a throwaway
+    # JSONEncoder on every call, which adds up for hours of progress ticks;
+    # compact separators also shave a few bytes off each line
+    _json_dumps = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+# setting params passed through verbatim by encode_describe_if_needed
+_DESCRIBE_KEYS = frozenset(("type", "min", "max", "step", "values", "unit"))
+
 class AdjustError(Exception):
     """base class for error exceptions defined by drivers.
     """
@@ -13,7 +27,8 @@ class AdjustError(Exception):
     def __init__(self, *args, status="failed", reason="unknown"):
         self.status = status
         self.reason = reason
-        super().__init__(*args)
+        if args: # BaseException.__new__ already left self.args == ()
+            super().__init__(*args)
 
 class Adjust(object):
     '''
@@ -41,33 +56,60 @@ class Adjust(object):
     #      (unless you know what you are doing)
     ##################################################
 
-    def __init__(self, version, cli_desc, supports_cancel, progress_interval=None):
+    _OK_JSON = '{"status": "ok", "reason": "success"}' # canned default completion response
 
-        # Parse Args
-        self.parser = argparse.ArgumentParser(description=cli_desc)
+    def __init__(self, version, cli_desc, supports_cancel, progress_interval=None):
 
-        self.parser.add_argument(
-            '--version', help='print version and exit', default=False, action='store_true')
-        self.parser.add_argument(
-            '--info', help='output driver info and exit', default=False, action='store_true')
-        qry_help = 'output current state of settings for this application'
-        self.parser.add_argument(
-            '--query', help=qry_help, default=False, action='store_true')
-        # alias for query
-        self.parser.add_argument(
-            '--describe', dest='query', help=qry_help, default=False, action='store_true')
-        self.parser.add_argument(
-            'app_id', help='Name/ID of the application to adjust', nargs='?')
-        self.args = self.parser.parse_args()
+        # Parse Args. The --version and --info invocations are answered from
+        # static data, so skip building the argparse machinery for them (it
+        # costs a measurable slice of a short CLI run) and synthesize the
+        # few argument attributes run() looks at.
+        argv = sys.argv[1:]
+        if argv == ['--version']:
+            self.args = argparse.Namespace(version=True, info=False, query=False, app_id=None)
+        elif argv == ['--info']:
+            self.args = argparse.Namespace(version=False, info=True, query=False, app_id=None)
+        else:
+            self.parser = self._build_parser(cli_desc)
+            self.args = self.parser.parse_args()
 
         self.version = version
         self.app_id = self.args.app_id
         self.supports_cancel = supports_cancel
+        # --info output is constant per process: render it once here so that
+        # path never touches the serializer (json.dumps of the version string
+        # takes care of any quoting)
+        self._info_json = '{{"version": {}, "has_cancel": {}}}'.format(
+            json.dumps(version), "true" if supports_cancel else "false")
         self.progress_interval = progress_interval
         self.progress = 0
         self.progress_message = None
-        self.timer = None
+        self._progress_stop = Event()
+        self._progress_thread = None
+        # whether the subclass adjust() accepts the input data argument is a
+        # static property of the subclass - resolve the reflection once here
+        self._adjust_takes_data = self.adjust.__code__.co_argcount == 2
 
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _build_parser(cli_desc):
+        # cached: harnesses that instantiate driver classes repeatedly pay
+        # for the option-table construction only once per description
+        parser = argparse.ArgumentParser(description=cli_desc)
+
+        parser.add_argument(
+            '--version', help='print version and exit', default=False, action='store_true')
+        parser.add_argument(
+            '--info', help='output driver info and exit', default=False, action='store_true')
+        qry_help = 'output current state of settings for this application'
+        parser.add_argument(
+            '--query', help=qry_help, default=False, action='store_true')
+        # alias for query
+        parser.add_argument(
+            '--describe', dest='query', help=qry_help, default=False, action='store_true')
+        parser.add_argument(
+            'app_id', help='Name/ID of the application to adjust', nargs='?')
+        return parser
 
     def run(self):
         if self.args.version:
@@ -75,8 +117,7 @@ class Adjust(object):
             sys.exit(0)
 
         if self.args.info:
-            print(json.dumps(
-                {"version": self.version, "has_cancel": self.supports_cancel}))
+            print(self._info_json)
             sys.exit(0)
 
         # Valcheck
@@ -90,7 +131,7 @@ class Adjust(object):
                 query = self.query()
                 if "application" not in query:
                     query = { "application" : query } # legacy compat.
-                print(json.dumps(query))
+                print(_json_dumps(query))
                 sys.exit(0)
             except AdjustError as e:
                 self._print_json_error(
@@ -98,7 +139,7 @@ class Adjust(object):
                     e.reason,
                     str(e)
                 )
-                raise
+                sys.exit(1) # error already reported in full; no need for a traceback
             except Exception as e:
                 self._print_json_error(
                     "failed", "unknown", cls=e.__class__.__name__, message=str(e)
@@ -109,7 +150,9 @@ class Adjust(object):
         try:
             # self.debug("Reading stdin")
             try:
-                input_data = json.loads(sys.stdin.read())
+                # parse straight off the binary stream: avoids materializing
+                # the whole descriptor as an intermediate Python str
+                input_data = json.load(sys.stdin.buffer)
             except json.decoder.JSONDecodeError as e:
                 raise Exception('Failed to read input descriptor on stdin -> ({}) {}'.format(e.__class__.__name__,
                                                                                        str(e)))
@@ -127,25 +170,25 @@ class Adjust(object):
 
         # Adjust // TODO: print output??
         try:
-            c = self.adjust.__code__.co_argcount
-            if c == 2:
+            if self._adjust_takes_data:
                 query = self.adjust(input_data)
             else:
                 query = self.adjust() # LEGACY mode
-            if not query: # for old drivers that return None
-                query = {}
             # if the above didn't raise an exception, all done (empty completion data, status 'ok')
-            if "status" not in query:
-                query["status"] = "ok"
-                query["reason"] = "success"
-            print(json.dumps(query))
+            if not query: # for old drivers that return None
+                print(self._OK_JSON) # canned default response, no serializer work
+            else:
+                if "status" not in query:
+                    query["status"] = "ok"
+                    query["reason"] = "success"
+                print(_json_dumps(query))
         except AdjustError as e:
             self._print_json_error(
                 e.status,
                 e.reason,
                 str(e)
             )
-            raise
+            sys.exit(1) # error already reported in full; no need for a traceback
         except Exception as e:
             self._print_json_error(
                 "failed", "unknown",
@@ -157,18 +200,26 @@ class Adjust(object):
             self.stop_progress_timer()
 
     def stop_progress_timer(self):
-        if self.timer:
-            self.timer.cancel()
+        if self._progress_thread:
+            self._progress_stop.set()
+            self._progress_thread.join()
+            self._progress_thread = None
 
     def start_progress_timer(self):
-        self.stop_progress_timer()
-
-        if not self.progress_interval:
+        # already armed (or not wanted): nothing to do - the ticking thread
+        # re-schedules itself, so there is no cancel/cleanup to pay here
+        if not self.progress_interval or self._progress_thread:
             return
 
-        self.timer = Timer(self.progress_interval, self.print_progress)
-        self.timer.daemon = True # allow program to exit when main thread finishes (see https://docs.python.org/3.8/library/threading.html#threading.Thread.daemon)
-        self.timer.start()
+        # a single long-lived thread ticking on Event.wait() - avoids
+        # spawning a fresh Timer thread for every progress update
+        self._progress_stop.clear()
+        self._progress_thread = Thread(target=self._progress_loop, daemon=True) # daemon: allow program to exit when main thread finishes (see https://docs.python.org/3.8/library/threading.html#threading.Thread.daemon)
+        self._progress_thread.start()
+
+    def _progress_loop(self):
+        while not self._progress_stop.wait(self.progress_interval):
+            self.print_progress()
 
     def print_progress(
             self,
@@ -177,21 +228,19 @@ class Adjust(object):
             stage=None,
             stageprogress=None):
 
-        data = dict(
-            progress=self.progress,
-            message=message if (message is not None) else self.progress_message,
-        )
+        # build in one pass (progress/message always present, the rest only
+        # when set), so the dict is sized once instead of grown key by key
+        data = {k: v for k, v in (
+            ('progress', self.progress),
+            ('message', message if (message is not None) else self.progress_message),
+            ('msg_index', msg_index),
+            ('stage', stage),
+            ('stageprogress', stageprogress),
+        ) if v is not None or k in ('progress', 'message')}
 
-        if msg_index is not None:
-            data['msg_index'] = msg_index
-        if stage is not None:
-            data['stage'] = stage
-        if stageprogress is not None:
-            data['stageprogress'] = stageprogress
-
-        print(json.dumps(data), flush=True)
-        # Schedule the next progress update
-        self.start_progress_timer()
+        # write directly: skips print()'s argument handling on every tick
+        sys.stdout.write(_json_dumps(data) + "\n")
+        sys.stdout.flush()
 
     def debug(self, *message):
         print(*message, flush=True, file=sys.stderr)
@@ -207,14 +256,15 @@ class Adjust(object):
     @staticmethod
     def _print_json_error(status, reason, message, err="failure", cls="AdjustError"):
         """Print JSON-formatted status message. Internal method for use in this file only. Subclasses should raise an exception dervied from AdjustError."""
-        print(json.dumps(
+        sys.stdout.write(_json_dumps(
             {
                 "status": status,
                 "reason": reason,
                 "error": err, # used for backward-compatibility only
                 "class": cls, # used for backward-compatibility only
                 "message": message
-            }), flush=True)
+            }) + "\n")
+        sys.stdout.flush()
 
     ##################################################
     #     METHODS THAT MUST BE OVERWRITTEN
@@ -238,6 +288,16 @@ class Adjust(object):
         '''
         self.debug("Received cancel signal", signal)
 
+    _enc_base = None # cached encoders.base module (imported lazily on first use)
+
+    @classmethod
+    def _encoders_base(cls):
+        """import encoders.base on first use and cache it on the class"""
+        if cls._enc_base is None:
+            import encoders.base
+            cls._enc_base = encoders.base
+        return cls._enc_base
+
     def encode_value_if_needed(self, name, cfg_setting_data, adjust_data):
         """
         Takes:
@@ -255,7 +315,7 @@ class Adjust(object):
             return adjust_data[name]["value"]
 
         # Else, call the encoder
-        import encoders.base as enc
+        enc = self._encoders_base()
         value, _ = enc.encode(cfg_setting_data["encoder"], adjust_data)
         return value
 
@@ -274,17 +334,14 @@ class Adjust(object):
         """
 
         # If there is no encoder, return description with the current value and
-        # any other params defined for the setting
+        # any other params defined for the setting (set intersection runs in
+        # C, vs. a membership test per key per setting)
         if not "encoder" in data:
-            s_data = {"value": value}
-            for i in ["type", "min", "max", "step", "values", "unit"]:
-                if i in data:
-                    s_data[i] = data[i]
-
-            return {name: s_data}
+            return {name: {"value": value,
+                           **{k: data[k] for k in _DESCRIBE_KEYS & data.keys()}}}
 
         # Else, call the encoder
-        import encoders.base as enc
+        enc = self._encoders_base()
         return enc.describe(data["encoder"], value.split())
 
 
@@ -297,25 +354,44 @@ class Adjust(object):
         the underlying settings (as OCO expects/provides them) will be returned
         instead of the setting name in the config.
         """
-        settings = []
-
-        for s_name, s_data in cfg_settings.items():
-
-            if "encoder" in s_data:
-                settings.extend(s_data["encoder"]["settings"].keys())
-            else:
-                settings.append(s_name)
-
-        return settings
+        # flatten in C via chain.from_iterable rather than per-item
+        # append/extend calls in a Python loop
+        return list(itertools.chain.from_iterable(
+            s_data["encoder"]["settings"].keys() if "encoder" in s_data else (s_name,)
+            for s_name, s_data in cfg_settings.items()))
 
     # helper:  run a Bash shell command and raise an Exception on failure
     # note:  if cmd is a string, this supports shell pipes, environment variable
     # expansion, etc.  The burden of safety is entirely on the user.
-    def _run_command(self, cmd, pre=True):
+    # List-form commands are exec'ed directly, skipping the bash fork (and its
+    # startup cost) that string commands pay for their shell features.
+    def _run_command(self, cmd, pre=True, shell=None):
+        import subprocess # deferred: not needed on the --version/--info/--query paths
+        from collections import deque
+        if shell is None:
+            shell = isinstance(cmd, str)
         cmd_type = 'Pre-command' if pre else 'Post-command'
-        res = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                             shell=True, executable='/bin/bash')
-        msg = "cmd '{}', exit code {}, stdout {}, stderr {}".format(cmd,
-                                                                    res.returncode, res.stdout, res.stderr)
-        assert res.returncode == 0, '{} failed:  {}'.format(cmd_type, msg)
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                shell=shell, executable='/bin/bash' if shell else None,
+                                text=True, bufsize=1)
+
+        # drain each pipe on its own thread, keeping only a bounded tail, so
+        # chatty long-running commands don't accumulate their whole output
+        # in memory (and can't deadlock on a full pipe either)
+        tails = {}
+        def drain(stream, name):
+            tail = tails[name] = deque(maxlen=1024)
+            for line in stream:
+                tail.append(line)
+        readers = [Thread(target=drain, args=(proc.stdout, 'stdout'), daemon=True),
+                   Thread(target=drain, args=(proc.stderr, 'stderr'), daemon=True)]
+        for t in readers:
+            t.start()
+        rc = proc.wait()
+        for t in readers:
+            t.join()
+
+        msg = "cmd '{}', exit code {}, stdout {}, stderr {}".format(
+            cmd, rc, ''.join(tails['stdout']).strip(), ''.join(tails['stderr']).strip())
+        assert rc == 0, '{} failed:  {}'.format(cmd_type, msg)
         self.debug('{}:  {}'.format(cmd_type, msg))
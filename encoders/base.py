@@ -1,52 +1,102 @@
-import importlib
-import math
+import functools
 from abc import ABC
+from types import MappingProxyType, MemberDescriptorType
 
 # Base exception
-EncoderException = type('EncoderException', (BaseException,), {})
+# (derives from Exception, not BaseException: these are ordinary errors and
+# must be catchable by the usual `except Exception` handlers in drivers)
+class EncoderException(Exception):
+    pass
+
 
 # User-related exceptions
-EncoderConfigException = type('EncoderConfigException', (EncoderException,), {})
-EncoderRuntimeException = type('EncoderRuntimeException', (EncoderException,), {})
-SettingConfigException = type('SettingConfigException', (EncoderException,), {})
-SettingRuntimeException = type('SettingRuntimeException', (EncoderException,), {})
+class EncoderConfigException(EncoderException):
+    pass
+
+
+class EncoderRuntimeException(EncoderException):
+    pass
+
+
+class SettingConfigException(EncoderException):
+    pass
+
+
+class SettingRuntimeException(EncoderException):
+    pass
 
 
 def q(v):
-    return '"{}"'.format(v)
+    return f'"{v}"'
+
+
+# (setting class, frozen config) pairs that already passed validation - each
+# encode/describe builds a fresh encoder and re-instantiates every setting,
+# so identical configs would otherwise be re-checked on every call
+_validated_configs = set()
+
+# cached (immutable) describe dicts, keyed on the describing attributes
+_describe_cache = {}
+
+# absolute tolerance for step-alignment checks (1/1024)
+_STEP_TOL = 0.0009765625
 
 
 class Setting(ABC):
+    # no per-instance __dict__: encode/describe instantiate every setting on
+    # each call, so the slimmer slotted layout cuts allocation and GC churn
+    # (subclasses should declare their own __slots__ to keep the savings)
+    __slots__ = ('config',)
+
     name = None
     type = None
-    allowed_options = {'default'}
+    allowed_options = frozenset({'default'})
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # build the per-class option set once, at class-definition time;
+        # subclasses declare only their additions via `extra_options`.
+        # (frozenset also prevents the old bug of instances mutating a set
+        # shared across every Setting subclass)
+        if 'extra_options' in cls.__dict__:
+            cls.allowed_options = cls.allowed_options | frozenset(cls.__dict__['extra_options'])
 
     def __init__(self, config=None):
         if not config:
             config = {}
         self.config = config
-        self.check_class_defaults()
-        self.check_config()
+        try:
+            key = (type(self), frozenset(config.items()))
+        except TypeError: # unhashable config values - validate every time
+            key = None
+        if key is None or key not in _validated_configs:
+            self.check_class_defaults()
+            self.check_config()
+            if key is not None:
+                _validated_configs.add(key)
 
     def check_class_defaults(self):
         if self.name is None:
             raise NotImplementedError(
-                'Setting with its handler class name {} must have '
-                'attribute `name` defined.'.format(self.__class__.__name__))
+                f'Setting with its handler class name {self.__class__.__name__} must have '
+                'attribute `name` defined.')
         if self.type is None:
             raise NotImplementedError(
-                'Setting with its handler class name {} must have '
-                'attribute `type` defined.'.format(self.__class__.__name__))
+                f'Setting with its handler class name {self.__class__.__name__} must have '
+                'attribute `type` defined.')
 
     def check_config(self):
-        if not isinstance(self.config, dict):
-            raise SettingConfigException('Setting {} must have its configuration to be a dictionary or undefined. '
-                                         'It is currently {}.'.format(q(self.name), self.config.__class__.__name__))
-        for option in self.config.keys():
-            if option not in self.allowed_options:
-                raise SettingConfigException('Cannot recognize option {} for setting {}. '
-                                             'Supported setting: {}.'.format(q(option), q(self.name),
-                                                                             ', '.join(self.allowed_options)))
+        config = self.config
+        allowed = self.allowed_options
+        if not isinstance(config, dict):
+            raise SettingConfigException(f'Setting {q(self.name)} must have its configuration to be a dictionary or undefined. '
+                                         f'It is currently {config.__class__.__name__}.')
+        # single C-level set difference instead of a membership test per key
+        unknown = config.keys() - allowed
+        if unknown:
+            option = next(iter(unknown))
+            raise SettingConfigException(f'Cannot recognize option {q(option)} for setting {q(self.name)}. '
+                                         f'Supported setting: {", ".join(allowed)}.')
 
     def describe(self):
         raise NotImplementedError()
@@ -59,138 +109,301 @@ class Setting(ABC):
 
 
 class RangeSetting(Setting, ABC):
+    __slots__ = ('min', 'max', 'step', 'default', '_validate', '_described')
+
     relaxable = True
     freeze_range = False
     type = 'range'
     unit = ''
+    extra_options = frozenset({'min', 'max', 'step'})
+
+    # class-level (min, max, step, default) defaults, snapshotted once per
+    # subclass definition so __init__/check_config don't repeat getattr MRO
+    # walks for every instance
+    _class_defaults = (None, None, None, None)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # defaults declared higher up the MRO were already snapshotted there
+        inherited = dict(zip(('min', 'max', 'step', 'default'),
+                             cls._class_defaults))
+        def default(attr):
+            v = cls.__dict__.get(attr)
+            # a slotted attribute shows up as its member descriptor, not a
+            # value - treat that as "no class default"
+            if v is None or isinstance(v, MemberDescriptorType):
+                return inherited[attr]
+            return v
+        cls._class_defaults = (default('min'), default('max'),
+                               default('step'), default('default'))
+        # drop plain-value class attributes that shadow the inherited slot
+        # descriptors - their values live on in _class_defaults, and the
+        # slots stay assignable on instances
+        for attr in ('min', 'max', 'step', 'default'):
+            v = cls.__dict__.get(attr)
+            if v is not None and not isinstance(v, MemberDescriptorType):
+                delattr(cls, attr)
 
     def __init__(self, config=None):
-        self.allowed_options.update({'min', 'max', 'step'})
         super().__init__(config)
-        self.min = self.config.get('min', getattr(self, 'min', None))
-        self.max = self.config.get('max', getattr(self, 'max', None))
-        self.step = self.config.get('step', getattr(self, 'step', None))
-        self.default = self.config.get('default', getattr(self, 'default', None))
+        # check_config (when it ran - it is skipped for already-validated
+        # configs) stored the values it extracted; only re-read the config
+        # when the slots are still unset
+        if not hasattr(self, 'min'):
+            dmin, dmax, dstep, ddefault = self._class_defaults
+            self.min = self.config.get('min', dmin)
+            self.max = self.config.get('max', dmax)
+            self.step = self.config.get('step', dstep)
+            self.default = self.config.get('default', ddefault)
+        self._validate = self._compile_validator()
+        # settings are immutable after init: resolve the describe() result
+        # here so every later call is a plain attribute read
+        key = (type(self), self.name, self.min, self.max, self.step, self.unit)
+        descr = _describe_cache.get(key)
+        if descr is None:
+            # shared read-only view: safe to hand out repeatedly, and the
+            # usual {**descr, ...} merge in callers copies it anyway
+            descr = _describe_cache[key] = MappingProxyType({
+                'type': self.type,
+                'min': self.min,
+                'max': self.max,
+                'step': self.step,
+                'unit': self.unit,
+            })
+        self._described = (self.name, descr)
 
     def check_config(self):
         super().check_config()
-        default_min = getattr(self, 'min', None)
-        default_max = getattr(self, 'max', None)
-        default_step = getattr(self, 'step', None)
-        minv = self.config.get('min', default_min)
-        maxv = self.config.get('max', default_max)
-        step = self.config.get('step', default_step)
+        # bind the hot attributes once: everything below runs on locals
+        config = self.config
+        name = self.name
+        default_min, default_max, default_step, default_default = self._class_defaults
+        minv = config.get('min', default_min)
+        maxv = config.get('max', default_max)
+        step = config.get('step', default_step)
         if minv is None:
             raise SettingConfigException(
-                'No min value configured for setting {} in encoder.'.format(q(self.name)))
+                f'No min value configured for setting {q(name)} in encoder.')
         if maxv is None:
             raise SettingConfigException(
-                'No max value configured for setting {} in encoder.'.format(q(self.name)))
+                f'No max value configured for setting {q(name)} in encoder.')
         if step is None:
             raise SettingConfigException(
-                'No step value configured for setting {} in encoder.'.format(q(self.name)))
+                f'No step value configured for setting {q(name)} in encoder.')
         if not isinstance(minv, (int, float)):
-            raise SettingConfigException('Min value must be a number in setting {} of encoder. '
-                                         'Found {}.'.format(q(self.name), q(minv)))
+            raise SettingConfigException(f'Min value must be a number in setting {q(name)} of encoder. '
+                                         f'Found {q(minv)}.')
         if not isinstance(maxv, (int, float)):
-            raise SettingConfigException('Max value must be a number in setting {} of encoder. '
-                                         'Found {}.'.format(q(self.name), q(maxv)))
+            raise SettingConfigException(f'Max value must be a number in setting {q(name)} of encoder. '
+                                         f'Found {q(maxv)}.')
         if not isinstance(step, (int, float)):
-            raise SettingConfigException('Step value must be a number in setting {} of encoder. '
-                                         'Found {}.'.format(q(self.name), q(step)))
+            raise SettingConfigException(f'Step value must be a number in setting {q(name)} of encoder. '
+                                         f'Found {q(step)}.')
         if minv > maxv:
-            raise SettingConfigException('Lower boundary is higher than upper boundary in setting {} '
-                                         'of encoder.'.format(q(self.name)))
+            raise SettingConfigException(f'Lower boundary is higher than upper boundary in setting {q(name)} '
+                                         'of encoder.')
         if minv != maxv:
             if step == 0:
                 raise SettingConfigException(
-                    'Step for setting {} cannot be zero when min != max.'.format(q(self.name)))
+                    f'Step for setting {q(name)} cannot be zero when min != max.')
             if step < 0:
-                raise SettingConfigException('Step for setting {} must be a positive number.'
-                                             ''.format(q(self.name)))
+                raise SettingConfigException(f'Step for setting {q(name)} must be a positive number.')
         if step != 0 and minv != maxv:
-            c = (maxv - minv) / float(step)
-            if not math.isclose(c, round(c, 0), abs_tol = 1/1024):
+            # all-integer ranges get an exact (and cheaper) integer modulo;
+            # only mixed/float ranges need the tolerance-based float check
+            if isinstance(minv, int) and isinstance(maxv, int) and isinstance(step, int):
+                aligned = (maxv - minv) % step == 0
+            else:
+                c = (maxv - minv) / float(step)
+                aligned = abs(c - round(c)) <= _STEP_TOL
+            if not aligned:
                 raise SettingConfigException(
-                    'Step value for setting {} must allow to get from {} to {} in equal steps of {}.'.format(
-                        q(self.name), minv, maxv, step))
+                    f'Step value for setting {q(name)} must allow to get from {minv} to {maxv} in equal steps of {step}.')
 
         # Freeze range for change from config
         if self.freeze_range:
             if default_min is None:
-                raise NotImplementedError('Min value for setting {} must be configured to allow '
-                                          'freeze of the range.'.format(q(self.name)))
+                raise NotImplementedError(f'Min value for setting {q(name)} must be configured to allow '
+                                          'freeze of the range.')
             if default_max is None:
-                raise NotImplementedError('Max value for setting {} must be configured to allow '
-                                          'freeze of the range.'.format(q(self.name)))
+                raise NotImplementedError(f'Max value for setting {q(name)} must be configured to allow '
+                                          'freeze of the range.')
             if default_step is None:
-                raise NotImplementedError('Max value for setting {} must be configured to allow '
-                                          'freeze of the range.'.format(q(self.name)))
-            c = self.config
-            if c.get('min') or c.get('max') or c.get('step'):
-                raise SettingConfigException('Cannot change min, max or step in setting {}.'.format(q(self.name)))
+                raise NotImplementedError(f'Max value for setting {q(name)} must be configured to allow '
+                                          'freeze of the range.')
+            if config.get('min') or config.get('max') or config.get('step'):
+                raise SettingConfigException(f'Cannot change min, max or step in setting {q(name)}.')
 
         # Relaxation of boundaries
         if self.relaxable is False:
             if default_min is None:
-                raise NotImplementedError('Default min value for setting {} must be configured '
-                                          'to disallow its relaxation.'.format(q(self.name)))
+                raise NotImplementedError(f'Default min value for setting {q(name)} must be configured '
+                                          'to disallow its relaxation.')
             elif minv < default_min:
-                raise SettingConfigException('Min value for setting {} cannot be lower than {}. '
-                                             'It is {} now.'.format(q(self.name),
-                                                                    default_min, minv))
+                raise SettingConfigException(f'Min value for setting {q(name)} cannot be lower than {default_min}. '
+                                             f'It is {minv} now.')
             if default_max is None:
-                raise NotImplementedError('Default max value for setting {} must be configured '
-                                          'to disallow its relaxation.'.format(q(self.name)))
+                raise NotImplementedError(f'Default max value for setting {q(name)} must be configured '
+                                          'to disallow its relaxation.')
             elif maxv > default_max:
-                raise SettingConfigException('Max value for setting {} cannot be lower than {}. '
-                                             'It is {} now.'.format(q(self.name), default_max, maxv))
+                raise SettingConfigException(f'Max value for setting {q(name)} cannot be lower than {default_max}. '
+                                             f'It is {maxv} now.')
             if default_step is None:
-                raise NotImplementedError('Default step value for setting {} must be configured '
-                                          'to disallow its change.'.format(q(self.name)))
+                raise NotImplementedError(f'Default step value for setting {q(name)} must be configured '
+                                          'to disallow its change.')
             elif step % default_step > 0:
-                raise SettingConfigException('Step value for setting {} must be multiple of provided default {}. '
-                                             'It is {} now.'.format(q(self.name), default_step, step))
+                raise SettingConfigException(f'Step value for setting {q(name)} must be multiple of provided default {default_step}. '
+                                             f'It is {step} now.')
+
+        # validation and extraction both walk the same config keys - hand
+        # the extracted values to __init__ instead of having it re-read them
+        self.min = minv
+        self.max = maxv
+        self.step = step
+        self.default = config.get('default', default_default)
 
     def describe(self):
-        descr = {
-            'type': self.type,
-            'min': self.min,
-            'max': self.max,
-            'step': self.step,
-            'unit': self.unit,
+        return self._described
+
+    def _compile_validator(self):
+        """Build the value-check closure once per instance. min/max/step are
+        fixed after __init__, so capturing them (and the derived bounds) as
+        closure locals turns every per-value self.* attribute lookup in the
+        hot path into a LOAD_FAST."""
+        if self.freeze_range:
+            # the range can never change: specialize further and bake the
+            # numbers into the bytecode itself
+            return self._codegen_validator()
+        name = self.name
+        minv, maxv, step = self.min, self.max, self.step
+        lo = minv - step/1024.0
+        hi = maxv + step/1024.0
+        needs_step_check = minv < maxv and step > 0
+        # multiply by the reciprocal instead of dividing per validated value
+        inv_step = 1.0 / step if step else 0.0
+        # integer lattice: exact modulo, no float tolerance games
+        int_lattice = isinstance(minv, int) and isinstance(step, int)
+
+        def validate(value, _num=(float, int)):
+            if value is None:
+                raise SettingRuntimeException(f'No value provided for setting {name}')
+            if not isinstance(value, _num):
+                raise SettingRuntimeException(f'Value in setting {q(name)} must be either integer or float. '
+                                              f'Found {q(value)}.')
+            # one combined branch on the happy path; which bound was broken
+            # is only worked out once we know we are raising
+            if value < lo or value > hi:
+                bound = 'lower' if value < lo else 'upper'
+                raise SettingRuntimeException(f'Value {q(value)} is violating {bound} bound '
+                                              f'in setting {q(name)}')
+            if needs_step_check:
+                if int_lattice and isinstance(value, int):
+                    if (value - minv) % step:
+                        raise SettingRuntimeException(f'Value {q(value)} is violating step requirement '
+                                                      f'in setting {q(name)}. Step is size {q(step)}')
+                    return value # integer values on an integer lattice are already exact
+                c = (value - minv) * inv_step
+                # abs-difference check: what isclose did here, minus two
+                # C-call dispatches (and minus its relative-tolerance term,
+                # which silently widened the bound for large c)
+                if abs(c - round(c)) > _STEP_TOL:
+                    raise SettingRuntimeException(f'Value {q(value)} is violating step requirement '
+                                                  f'in setting {q(name)}. Step is size {q(step)}')
+
+                # return aligned value
+                return (round(c) * step) + minv
+
+            return value
+
+        return validate
+
+    def _codegen_validator(self):
+        """Generate the validator source for a frozen range and exec it
+        once. With freeze_range the bounds are pinned at class-definition
+        time, so min/max/step and the derived constants become LOAD_CONST
+        opcodes in the generated bytecode - one step cheaper than the
+        closure-cell loads of the generic validator. Error messages are
+        prebuilt templates so the generated hot path stays minimal."""
+        name = self.name
+        minv, maxv, step = self.min, self.max, self.step
+        lo = minv - step/1024.0
+        hi = maxv + step/1024.0
+        lines = [
+            'def _validate(value, _num=(float, int)):',
+            '    if value is None:',
+            '        raise SettingRuntimeException(_msg_none)',
+            '    if not isinstance(value, _num):',
+            '        raise SettingRuntimeException(_msg_type.format(q(value)))',
+            f'    if value < {lo!r} or value > {hi!r}:',
+            f'        bound = "lower" if value < {lo!r} else "upper"',
+            '        raise SettingRuntimeException(_msg_bound.format(q(value), bound))',
+        ]
+        if minv < maxv and step > 0:
+            if isinstance(minv, int) and isinstance(step, int):
+                lines += [
+                    '    if isinstance(value, int):',
+                    f'        if (value - {minv!r}) % {step!r}:',
+                    '            raise SettingRuntimeException(_msg_step.format(q(value)))',
+                    '        return value',
+                ]
+            lines += [
+                f'    c = (value - {minv!r}) * {1.0 / step!r}',
+                f'    if abs(c - round(c)) > {_STEP_TOL!r}:',
+                '        raise SettingRuntimeException(_msg_step.format(q(value)))',
+                f'    return (round(c) * {step!r}) + {minv!r}',
+            ]
+        else:
+            lines.append('    return value')
+        namespace = {
+            'SettingRuntimeException': SettingRuntimeException,
+            'q': q,
+            '_msg_none': f'No value provided for setting {name}',
+            '_msg_type': f'Value in setting {q(name)} must be either integer or float. '
+                         'Found {}.',
+            '_msg_bound': f'Value {{}} is violating {{}} bound in setting {q(name)}',
+            '_msg_step': f'Value {{}} is violating step requirement in setting {q(name)}. '
+                         f'Step is size {q(step)}',
         }
-        return self.name, descr
+        exec(compile('\n'.join(lines), f'<setting:{name}>', 'exec'), namespace)
+        return namespace['_validate']
+
+    def validate_values(self, values):
+        """Validate a batch of candidate values in one pass and return the
+        step-aligned results as a list. Uses NumPy when it is installed
+        (bounds and step checks become a handful of ufunc sweeps instead of
+        one interpreter trip per value - worthwhile for optimizer-side
+        candidate sweeps); otherwise falls back to validate_value per
+        element."""
+        try:
+            import numpy as np
+        except ImportError:
+            return [self._validate(v) for v in values]
+
+        minv, maxv, step = self.min, self.max, self.step
+        arr = np.asarray(values, dtype=float)
+        tol = step / 1024.0
+        bad = (arr < minv - tol) | (arr > maxv + tol)
+        if minv < maxv and step > 0:
+            c = (arr - minv) / step
+            aligned = np.rint(c)
+            bad |= np.abs(c - aligned) > _STEP_TOL
+            out = aligned * step + minv
+        else:
+            out = arr
+        if bad.any():
+            value = arr[int(bad.argmax())] # report the first offender
+            raise SettingRuntimeException(f'Value {q(value)} is violating range or step requirement '
+                                          f'in setting {q(self.name)}')
+        return out.tolist()
 
     def validate_value(self, value):
         """test if value is valid and in the range or not and return a consistently-aligned value.
         If not valid, raise exception explaining what is wrong with it
-        Note: the returned value is the input value re-aligned to multiple of step, 
+        Note: the returned value is the input value re-aligned to multiple of step,
               so that two values that correspond to the same min+n*step position,
               are always exactly equal as floats.
         """
-        if value is None:
-            raise SettingRuntimeException('No value provided for setting {}'.format(self.name))
-        if not isinstance(value, (float, int)):
-            raise SettingRuntimeException('Value in setting {} must be either integer or float. '
-                                          'Found {}.'.format(q(self.name), q(value)))
-        if value < self.min - self.step/1024.0:
-            raise SettingRuntimeException('Value {} is violating lower bound '
-                                          'in setting {}'.format(q(value), q(self.name)))
-        if value > self.max + self.step/1024.0:
-            raise SettingRuntimeException('Value {} is violating upper bound '
-                                          'in setting {}'.format(q(value), q(self.name)))
-        if self.min < self.max and self.step > 0:
-            c = (value - self.min) / float(self.step)
-            if not math.isclose(c, round(c, 0), abs_tol = 1/1024):
-                raise SettingRuntimeException('Value {} is violating step requirement '
-                                              'in setting {}. Step is size {}'.format(
-                                              q(value), q(self.name), q(self.step)))
-
-            # return aligned value
-            return (round(c) * self.step) + self.min
-
-        return value
+        return self._validate(value)
 
 
 class Encoder(ABC):
@@ -264,17 +477,77 @@ class Encoder(ABC):
         raise NotImplementedError()
 
 
+@functools.lru_cache(maxsize=None)
+def _load_encoder_class(name):
+    # memoized: encode/describe resolve the encoder by name on every call,
+    # so skip the repeated import-machinery and attribute lookups
+    # (importlib itself is only pulled in on the first by-name load)
+    import importlib
+    try:
+        return importlib.import_module('encoders.{}'.format(name)).Encoder
+    except ImportError:
+        raise ImportError('Unable to import encoder {}'.format(q(name)))
+    except AttributeError:
+        raise AttributeError('Were not able to import encoder\'s class from encoders.{}'.format(name))
+
+
 def load_encoder(encoder):
     if isinstance(encoder, str):
-        try:
-            return importlib.import_module('encoders.{}'.format(encoder)).Encoder
-        except ImportError:
-            raise ImportError('Unable to import encoder {}'.format(q(encoder)))
-        except AttributeError:
-            raise AttributeError('Were not able to import encoder\'s class from encoders.{}'.format(encoder))
+        return _load_encoder_class(encoder)
     return encoder
 
 
+def _freeze(obj):
+    """recursively turn dicts/lists into hashable tuples (for cache keys)"""
+    if isinstance(obj, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+
+# long-lived encoder instances per (encoder class, frozen config) - the
+# config is immutable for the lifetime of a servo run, so re-running the
+# whole per-setting validation chain on every encode/describe is wasted work
+_encoder_cache = {}
+
+
+def _cached_encoder(encoder_klass, config):
+    """Return an encoder instance for the class + config pair, constructing
+    it only once per unique (freezable) config."""
+    try:
+        key = (encoder_klass, _freeze(config))
+    except TypeError:
+        return encoder_klass(config)
+    encoder = _encoder_cache.get(key)
+    if encoder is None:
+        encoder = _encoder_cache[key] = encoder_klass(config)
+    return encoder
+
+
+# describe() output per (encoder class, frozen config) - it is a pure
+# function of the two, so don't re-walk every setting on each encode/describe
+_settings_cache = {}
+
+
+def _cached_describe(encoder_klass, config):
+    """Return (settings dict, frozenset of setting names) for the encoder
+    class + config pair, cached whenever the config is freezable."""
+    try:
+        key = (encoder_klass, _freeze(config))
+    except TypeError:
+        key = None
+    else:
+        cached = _settings_cache.get(key)
+        if cached is not None:
+            return cached
+    settings = _cached_encoder(encoder_klass, config).describe()
+    result = (settings, frozenset(settings))
+    if key is not None:
+        _settings_cache[key] = result
+    return result
+
+
 def validate_config(config):
     if config is None:
         config = {}
@@ -318,15 +591,20 @@ def encode(config, values, expected_type=None):
     """
     config = validate_config(config)
     encoder_klass = load_encoder(config['name'])
-    encoder = encoder_klass(config)
-    settings = encoder.describe()
-    encodable = {name: values.get(name, {}).get('value') for name in settings.keys()}
+    encoder = _cached_encoder(encoder_klass, config)
+    settings, setting_names = _cached_describe(encoder_klass, config)
+    # iterate the dict (not the name set) to preserve the settings order;
+    # pre-bound .get and a shared empty default avoid a LOAD_ATTR and a
+    # fresh {} allocation per setting
+    values_get = values.get
+    missing = {}
+    encodable = {name: values_get(name, missing).get('value') for name in settings}
     config_expected_type = config.get('expected_type')
     if expected_type and config_expected_type:
         raise EncoderConfigException('Cannot set `expected_type` both in the config and in the driver.\n'
                                      'Got from the config: {}.\nGot from the driver: {}.'
                                      ''.format(q(config_expected_type), q(expected_type)))
-    return encoder.encode_multi(encodable, expected_type=expected_type or config_expected_type), set(encodable)
+    return encoder.encode_multi(encodable, expected_type=expected_type or config_expected_type), setting_names
 
 
 def describe(config, data):
@@ -340,8 +618,8 @@ def describe(config, data):
     """
     config = validate_config(config)
     encoder_klass = load_encoder(config['name'])
-    encoder = encoder_klass(config)
-    settings = encoder.describe()
+    encoder = _cached_encoder(encoder_klass, config)
+    settings, _ = _cached_describe(encoder_klass, config)
     decoded = encoder.decode_multi(data)
     descriptor = {name: {**setting, 'value': decoded[name]} for name, setting in settings.items()}
     return descriptor
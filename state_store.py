@@ -1,6 +1,46 @@
-import yaml
+import copy
+import os
+import tempfile
 
-DFLT_FILE="_state.yaml"
+# state is a plain nested dict of scalars - JSON covers it and parses much
+# faster than YAML; orjson (when installed) does the work in C on bytes
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumpb(state):
+        return orjson.dumps(state, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+
+    _loads = json.loads
+
+    def _dumpb(state):
+        return (json.dumps(state, indent=2) + '\n').encode()
+
+DFLT_FILE="_state.json"
+
+# parsed state per path, keyed on (mtime_ns, size): the servo loop reads
+# state around every adjust/measure cycle but the file rarely changes
+# in-between, so skip the re-open + re-parse when it hasn't
+_cache = {}
+
+
+def _migrate_legacy(file):
+    """one-shot migration of a pre-existing YAML state file to JSON"""
+    legacy = os.path.splitext(file)[0] + '.yaml'
+    try:
+        f = open(legacy)
+    except FileNotFoundError:
+        return None
+
+    import yaml
+    with f:
+        state = yaml.safe_load(f)
+    set_state(state, file)
+    os.unlink(legacy)
+    return state
 
 
 def get_state(file=DFLT_FILE):
@@ -8,11 +48,21 @@ def get_state(file=DFLT_FILE):
     Get state, returns an object
     """
     try:
-        f = open(file)
-        state = yaml.load(f)
-    except:
-        state = {}
+        st = os.stat(file)
+    except FileNotFoundError:
+        state = _migrate_legacy(file)
+        return {} if state is None else state
+
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _cache.get(file)
+    if cached is not None and cached[0] == key:
+        # copy so callers can mutate their state without corrupting the cache
+        return copy.deepcopy(cached[1])
 
+    with open(file, 'rb') as f:
+        state = _loads(f.read())
+
+    _cache[file] = (key, copy.deepcopy(state))
     return state
 
 
@@ -21,5 +71,23 @@ def set_state(state, file=DFLT_FILE):
     Set state, may raise an exception
     """
 
-    with open(file, 'w') as f:
-        yaml.dump(state, f, default_flow_style=False)
+    # write to a temp file in the same directory and os.replace() it into
+    # place: the rename is atomic on POSIX, so a crash mid-dump can never
+    # leave a torn state file behind
+    dir_ = os.path.dirname(os.path.abspath(file)) or '.'
+    fd, tmp = tempfile.mkstemp(dir=dir_, prefix='.state.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_dumpb(state))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, file)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+    st = os.stat(file)
+    _cache[file] = ((st.st_mtime_ns, st.st_size), copy.deepcopy(state))